@@ -50,6 +50,11 @@ from .const import (
 from .protocols import ProtocolRegistry
 from .protocols.modbus import ModbusClient
 
+try:
+    import orjson  # bundled with Home Assistant
+except ImportError:
+    orjson = None
+
 _LOGGER = logging.getLogger(__name__)
 
 PLATFORMS = [Platform.SENSOR, Platform.NUMBER, Platform.SELECT, Platform.SWITCH]
@@ -209,8 +214,9 @@ async def _load_template_into_options(
     
     try:
         def load_file():
-            with open(template_path, "r", encoding="utf-8") as f:
-                return json.load(f)
+            with open(template_path, "rb") as f:
+                raw = f.read()
+            return orjson.loads(raw) if orjson is not None else json.loads(raw)
         
         template_data = await hass.async_add_executor_job(load_file)
         
@@ -230,7 +236,7 @@ async def _load_template_into_options(
         
     except FileNotFoundError:
         _LOGGER.error("Template file not found: %s", template_path)
-    except json.JSONDecodeError as err:
+    except json.JSONDecodeError as err:  # orjson.JSONDecodeError subclasses it
         _LOGGER.error("Failed to parse template %s: %s", template_name, err)
     except Exception as err:
         _LOGGER.error("Failed to load template %s: %s", template_name, err)
@@ -463,6 +469,7 @@ async def async_setup_services(hass: HomeAssistant) -> None:
                 value=value,
                 entity_config=entity_config,
                 size=call.data.get("size"),
+                force=call.data.get("force", False),
             )
     
             if not success:
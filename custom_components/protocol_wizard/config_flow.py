@@ -46,6 +46,11 @@ from .const import (
 from .options_flow import ProtocolWizardOptionsFlow
 from .protocols import ProtocolRegistry
 
+try:
+    import orjson  # bundled with Home Assistant
+except ImportError:
+    orjson = None
+
 _LOGGER = logging.getLogger(__name__)
 
 
@@ -101,33 +106,37 @@ class ProtocolWizardConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     # ================================================================
     
     def _get_available_templates(self) -> list[str]:
-        """Get list of available templates for current protocol."""
+        """Get list of available templates for current protocol (executor)."""
         protocol_subdir = "modbus" if self._protocol == CONF_PROTOCOL_MODBUS else "snmp"
         template_dir = self.hass.config.path(
             "custom_components", DOMAIN, "templates", protocol_subdir
         )
         
-        if not os.path.exists(template_dir):
-            return []
-        
         try:
-            return sorted([
-                f[:-5] for f in os.listdir(template_dir) if f.endswith(".json")
-            ])
+            with os.scandir(template_dir) as it:
+                templates = [
+                    e.name[:-5] for e in it
+                    if e.name.endswith(".json") and e.is_file()
+                ]
+        except FileNotFoundError:
+            return []
         except Exception as err:
             _LOGGER.debug("Failed to list templates: %s", err)
             return []
+        templates.sort()
+        return templates
 
     def _load_template_params(self, template_name: str) -> tuple[int, int]:
-        """Load first register address and size from template."""
+        """Load first register address and size from template (executor)."""
         protocol_subdir = "modbus" if self._protocol == CONF_PROTOCOL_MODBUS else "snmp"
         path = self.hass.config.path(
             "custom_components", DOMAIN, "templates", protocol_subdir, f"{template_name}.json"
         )
         
         try:
-            with open(path, "r", encoding="utf-8") as f:
-                template = json.load(f)
+            with open(path, "rb") as f:
+                raw = f.read()
+            template = orjson.loads(raw) if orjson is not None else json.loads(raw)
             
             if not template:
                 return 0, 1
@@ -155,7 +164,9 @@ class ProtocolWizardConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 if template_name:
                     self._selected_template = template_name
                     # Auto-fill test parameters from template
-                    addr, size = self._load_template_params(template_name)
+                    addr, size = await self.hass.async_add_executor_job(
+                        self._load_template_params, template_name
+                    )
                     self._data[CONF_FIRST_REG] = addr
                     self._data[CONF_FIRST_REG_SIZE] = size
             
@@ -165,7 +176,7 @@ class ProtocolWizardConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             return await self.async_step_modbus_ip()
         
         # Get available templates
-        templates = self._get_available_templates()
+        templates = await self.hass.async_add_executor_job(self._get_available_templates)
         template_options = [
             selector.SelectOptionDict(value=t, label=t)
             for t in templates
@@ -458,7 +469,7 @@ class ProtocolWizardConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 errors["base"] = "cannot_connect"
         
         # Get available templates
-        templates = self._get_available_templates()
+        templates = await self.hass.async_add_executor_job(self._get_available_templates)
         template_options = [
             selector.SelectOptionDict(value=t, label=t)
             for t in templates
@@ -513,8 +524,6 @@ class ProtocolWizardConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             version=data["version"],
         )
         
-        try:
-            if not await client.connect():
+        async with client:
+            if not client.is_connected:
                 raise ConnectionError("Failed to connect to SNMP device")
-        finally:
-            await client.disconnect()
@@ -20,18 +20,16 @@ class NumberManager(BaseEntityManager):
     
     def _should_create_entity(self, entity_config: dict) -> bool:
         """Create number only for writeable registers that are NOT coils."""
-        rw = entity_config.get("rw", "read")
-        reg_type = entity_config.get("register_type", "holding").lower()
-    
-        # Do not create number for coils (they are binary → use switch/select)
-        if reg_type == "coil":
+        # Cheapest check first: most entities are read-only sensors
+        if entity_config.get("rw") not in ("write", "rw"):
             return False
 
         # Do not create if it has options (that's a select)
         if entity_config.get("options"):
             return False
-    
-        return rw in ("write", "rw")
+
+        # Do not create number for coils (they are binary → use switch/select)
+        return entity_config.get("register_type", "holding").lower() != "coil"
     
     def _create_entity(self, entity_config: dict, unique_id: str, key: str):
         """Create a number entity."""
@@ -6,12 +6,20 @@ from __future__ import annotations
 
 import logging
 import json
+import mmap
 import os
+import time
+from collections import ChainMap
+from collections.abc import Mapping
 from datetime import timedelta
+from functools import cached_property, lru_cache
+from types import MappingProxyType
 import voluptuous as vol
 
 from homeassistant import config_entries
+from homeassistant.core import CALLBACK_TYPE, callback
 from homeassistant.helpers import selector
+from homeassistant.helpers.event import async_call_later
 
 from .const import (
     DOMAIN,
@@ -25,9 +33,55 @@ from .const import (
     CONF_WORD_ORDER,
     CONF_REGISTER_TYPE,
 )
+from .protocols.modbus import CONF_DETECTED_TYPE, CONF_MAX_GAP, DEFAULT_MAX_GAP, TYPE_SIZES
+
+try:
+    import orjson  # bundled with Home Assistant
+except ImportError:
+    orjson = None
 
 _LOGGER = logging.getLogger(__name__)
 
+# Delay before a batch of entity edits triggers a single entry reload
+RELOAD_DELAY = 1.5
+
+# Templates larger than this are decoded from an mmap instead of a read() copy
+_MMAP_TEMPLATE_SIZE = 1024 * 1024
+
+# Form values that clear an optional field
+_EMPTY_VALUES = (" ", "", None)
+
+# Edit-form fallbacks for fields an entity does not have (" " keeps dropdowns valid)
+_MODBUS_FORM_DEFAULTS = MappingProxyType({
+    "device_class": " ",
+    "state_class": " ",
+    "entity_category": " ",
+    "icon": "",
+    "unit": "",
+    "format": "",
+    "options": "",
+    "scale": 1.0,
+    "offset": 0.0,
+})
+_NO_OPTIONS = MappingProxyType({"options": ""})
+_SNMP_FORM_DEFAULTS = MappingProxyType({
+    "device_class": " ",
+    "state_class": " ",
+    "entity_category": " ",
+    "icon": "",
+    "format": "",
+    "scale": 1.0,
+    "offset": 0.0,
+    "read_mode": "get",
+    "data_type": "string",
+})
+
+# Sorted template names per directory: (dir mtime, checked at, names)
+_TEMPLATE_LIST_CACHE: dict[str, tuple[int, float, list[str]]] = {}
+
+# Listings checked more recently than this are reused without any filesystem access
+_TEMPLATE_LIST_TTL = 30.0
+
 
 # ============================================================================
 # Options Flow
@@ -36,12 +90,18 @@ _LOGGER = logging.getLogger(__name__)
 class ProtocolWizardOptionsFlow(config_entries.OptionsFlow):
     """Protocol-agnostic options flow for Protocol Wizard."""
 
+    # Menu entries that are always shown (read-only: shared by all flows)
+    _BASE_MENU = MappingProxyType({
+        "settings": "Settings",
+        "add_entity": "Add entity",
+        "load_template": "Load template",
+        "export_template": "Export template",
+    })
+
     def __init__(self, config_entry: config_entries.ConfigEntry):
         self._config_entry = config_entry
         self.protocol = config_entry.data.get(CONF_PROTOCOL, CONF_PROTOCOL_MODBUS)
 
-        self.schema_handler = self._get_schema_handler()
-
         # Determine the correct config key based on protocol
         if self.protocol == CONF_PROTOCOL_MODBUS:
             config_key = CONF_REGISTERS
@@ -51,9 +111,37 @@ class ProtocolWizardOptionsFlow(config_entries.OptionsFlow):
         self._entities: list[dict] = list(config_entry.options.get(config_key, []))
         self._edit_index: int | None = None
 
+        # (name, address) -> entity for self._entities, kept in sync for O(1) dedup
+        self._entity_index: dict[tuple, dict] = {}
+        self._rebuild_entity_index()
+
+        # Entity dropdown options shared by edit/list steps: (count, options)
+        self._options_cache: tuple[int, list[selector.SelectOptionDict]] | None = None
+        self._index_strs: list[str] = []
+        # Dropdown label per entity, parallel to _entities; None until first needed
+        self._labels: list[str] | None = None
+
+        # Menu shown when entities exist, rebuilt only when the count changes
+        self._menu_cache: tuple[int, dict[str, str]] | None = None
+
+        # Template names shown in the current load_template form (None = not listed)
+        self._templates: list[str] | None = None
+
+        # Whether the protocol template folder exists (checked once per flow)
+        self._template_dir_exists: bool | None = None
+
+        # Debounced reload: rapid edits/template loads collapse into one reload
+        self._pending_reload_unsub: CALLBACK_TYPE | None = None
+
     @property
     def config_entry(self) -> config_entries.ConfigEntry:
         return self._config_entry
+
+    @cached_property
+    def _template_dir(self) -> str:
+        """Protocol-specific template folder (hass is not set yet in __init__)."""
+        protocol_subdir = "modbus" if self.protocol == CONF_PROTOCOL_MODBUS else "snmp"
+        return self.hass.config.path("custom_components", DOMAIN, "templates", protocol_subdir)
         
     @staticmethod
     def _export_schema():
@@ -63,24 +151,41 @@ class ProtocolWizardOptionsFlow(config_entries.OptionsFlow):
         
     @staticmethod
     def _write_template(path: str, entities: list[dict]):
-        with open(path, "w", encoding="utf-8") as f:
-            json.dump(entities, f, indent=2)
+        # Detected register types belong to this device, not to the template.
+        entities = [
+            {k: v for k, v in e.items() if k != CONF_DETECTED_TYPE}
+            if CONF_DETECTED_TYPE in e else e
+            for e in entities
+        ]
+        if orjson is None:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(entities, f, indent=2)
+            return
+        with open(path, "wb") as f:
+            f.write(orjson.dumps(entities, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+
+    @staticmethod
+    def _ensure_and_write(path: str, entities: list[dict], make_dir: bool = True):
+        """Create the template folder if needed and write the template (executor)."""
+        if make_dir:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        ProtocolWizardOptionsFlow._write_template(path, entities)
     # ------------------------------------------------------------------
     # INIT
     # ------------------------------------------------------------------
 
     async def async_step_init(self, user_input=None):
-        menu_options = {
-            "settings": "Settings",
-            "add_entity": "Add entity",
-            "load_template": "Load template",
-            "export_template": "Export template",
-        }
-        if self._entities:
-            menu_options["list_entities"] = f"Entities ({len(self._entities)})"
-            menu_options["edit_entity"] = "Edit entity"
+        if not self._entities:
+            return self.async_show_menu(step_id="init", menu_options=dict(self._BASE_MENU))
 
-        return self.async_show_menu(step_id="init", menu_options=menu_options)
+        count = len(self._entities)
+        if self._menu_cache is None or self._menu_cache[0] != count:
+            self._menu_cache = (count, {
+                **self._BASE_MENU,
+                "list_entities": f"Entities ({count})",
+                "edit_entity": "Edit entity",
+            })
+        return self.async_show_menu(step_id="init", menu_options=self._menu_cache[1])
 
 
     # ------------------------------------------------------------------
@@ -91,26 +196,29 @@ class ProtocolWizardOptionsFlow(config_entries.OptionsFlow):
         if user_input:
             interval = user_input[CONF_UPDATE_INTERVAL]
 
-            coordinator = (
-                self.hass.data
-                .get(DOMAIN, {})
-                .get("coordinators", {})
-                .get(self._config_entry.entry_id)
-            )
-            if coordinator:
-                coordinator.update_interval = timedelta(seconds=interval)
-
-            self._save_options({CONF_UPDATE_INTERVAL: interval})
+            # Saving settings does not reload the entry, so apply the interval
+            # to the running coordinator here - but only when it changed
+            try:
+                coordinator = self.hass.data[DOMAIN]["coordinators"][self._config_entry.entry_id]
+            except KeyError:
+                coordinator = None
+            new_interval = timedelta(seconds=interval)
+            if coordinator and coordinator.update_interval != new_interval:
+                coordinator.update_interval = new_interval
+
+            updates = {CONF_UPDATE_INTERVAL: interval}
+            if CONF_MAX_GAP in user_input:
+                # Read by the coordinator on every poll
+                updates[CONF_MAX_GAP] = user_input[CONF_MAX_GAP]
+            self._save_options(updates)
             return self.async_abort(reason="settings_updated")
 
-        current = self._config_entry.options.get(CONF_UPDATE_INTERVAL, 10)
+        options = self._config_entry.options
+        current = options.get(CONF_UPDATE_INTERVAL, 10)
+        max_gap = options.get(CONF_MAX_GAP, DEFAULT_MAX_GAP) if self.protocol == CONF_PROTOCOL_MODBUS else None
         return self.async_show_form(
             step_id="settings",
-            data_schema=vol.Schema({
-                vol.Required(CONF_UPDATE_INTERVAL, default=current): vol.All(
-                    vol.Coerce(int), vol.Range(min=5, max=300)
-                )
-            }),
+            data_schema=_build_settings_schema(current, max_gap),
         )
 
     # ------------------------------------------------------------------
@@ -124,6 +232,9 @@ class ProtocolWizardOptionsFlow(config_entries.OptionsFlow):
             processed = self.schema_handler.process_input(user_input, errors, existing=None)
             if processed and not errors:
                 self._entities.append(processed)
+                self._entity_index[(processed.get("name"), processed.get("address"))] = processed
+                if self._labels is not None:
+                    self._labels.append(self.schema_handler.format_label(processed))
                 self._save_entities()
                 return await self.async_step_init()
 
@@ -142,13 +253,7 @@ class ProtocolWizardOptionsFlow(config_entries.OptionsFlow):
             self._edit_index = int(user_input["entity"])
             return await self.async_step_edit_entity_form()
 
-        options = [
-            selector.SelectOptionDict(
-                value=str(i),
-                label=self.schema_handler.format_label(e),
-            )
-            for i, e in enumerate(self._entities)
-        ]
+        options = self._entity_options()
 
         return self.async_show_form(
             step_id="edit_entity",
@@ -174,6 +279,15 @@ class ProtocolWizardOptionsFlow(config_entries.OptionsFlow):
             processed = self.schema_handler.process_input(user_input, errors, existing=entity)
             if processed and not errors:
                 self._entities[self._edit_index] = processed
+                if self._labels is not None:
+                    self._labels[self._edit_index] = self.schema_handler.format_label(processed)
+                old_key = (entity.get("name"), entity.get("address"))
+                new_key = (processed.get("name"), processed.get("address"))
+                if new_key == old_key and self._entity_index.get(old_key) is entity:
+                    # Key unchanged: just point the index at the new dict
+                    self._entity_index[new_key] = processed
+                else:
+                    self._rebuild_entity_index()
                 self._save_entities()
                 return await self.async_step_init()
 
@@ -192,23 +306,37 @@ class ProtocolWizardOptionsFlow(config_entries.OptionsFlow):
         if user_input:
             if user_input.get("delete_all"):
                 self._entities = []
+                self._labels = None
             else:
-                delete = set(user_input.get("delete", []))
-                self._entities = [
-                    e for i, e in enumerate(self._entities)
-                    if str(i) not in delete
-                ]
+                delete = {int(i) for i in user_input.get("delete", [])}
+                start = len(self._entities) - len(delete)
+                if delete and delete == set(range(start, len(self._entities))):
+                    # Trailing block selected: truncate instead of rebuilding
+                    del self._entities[start:]
+                    if self._labels is not None:
+                        del self._labels[start:]
+                elif len(delete) * 8 <= len(self._entities):
+                    # A few entries out of many: delete in place, highest index first
+                    for i in sorted(delete, reverse=True):
+                        del self._entities[i]
+                        if self._labels is not None:
+                            del self._labels[i]
+                else:
+                    self._entities = [
+                        e for i, e in enumerate(self._entities)
+                        if i not in delete
+                    ]
+                    if self._labels is not None:
+                        self._labels = [
+                            label for i, label in enumerate(self._labels)
+                            if i not in delete
+                        ]
         
+            self._rebuild_entity_index()
             self._save_entities()
             return await self.async_step_init()
 
-        options = [
-            selector.SelectOptionDict(
-                value=str(i),
-                label=self.schema_handler.format_label(e),
-            )
-            for i, e in enumerate(self._entities)
-        ]
+        options = self._entity_options()
 
         return self.async_show_form(
             step_id="list_entities",
@@ -232,71 +360,73 @@ class ProtocolWizardOptionsFlow(config_entries.OptionsFlow):
         """Load a device template — protocol-specific folder."""
         if user_input:
             filename = user_input["template"]
-            # Protocol-specific template directory
-            protocol_subdir = "modbus" if self.protocol == CONF_PROTOCOL_MODBUS else "snmp"
-            template_dir = self.hass.config.path(
-                "custom_components", DOMAIN, "templates", protocol_subdir
-            )
-            path = os.path.join(template_dir, f"{filename}.json")
+            path = os.path.join(self._template_dir, f"{filename}.json")
 
             try:
                 data = await self.hass.async_add_executor_job(self._load_template, path)
-                added = self.schema_handler.merge_template(self._entities, data)
+                added = self.schema_handler.merge_template(
+                    self._entities, data, self._entity_index
+                )
+                if added and self._labels is not None:
+                    self._labels.extend(
+                        self.schema_handler.format_label(e) for e in self._entities[-added:]
+                    )
                 if not added:
                     return self.async_show_form(
                         step_id="load_template",
-                        data_schema=self._get_template_schema(),
+                        data_schema=self._get_template_schema(self._templates),
                         errors={"base": "template_empty_or_duplicate"},
                     )
+                self._templates = None
                 self._save_entities()
                 return await self.async_step_init()
             except FileNotFoundError:
                 _LOGGER.error("Template file not found: %s", path)
                 return self.async_show_form(
                     step_id="load_template",
-                    data_schema=self._get_template_schema(),
+                    data_schema=self._get_template_schema(self._templates),
                     errors={"base": "template_not_found"},
                 )
             except Exception as err:
                 _LOGGER.error("Template load failed: %s", err)
                 return self.async_show_form(
                     step_id="load_template",
-                    data_schema=self._get_template_schema(),
+                    data_schema=self._get_template_schema(self._templates),
                     errors={"base": "load_failed"},
                 )
 
         # List templates from protocol-specific folder
-        protocol_subdir = "modbus" if self.protocol == CONF_PROTOCOL_MODBUS else "snmp"
-        template_dir = self.hass.config.path(
-            "custom_components", DOMAIN, "templates", protocol_subdir
-        )
+        template_dir = self._template_dir
 
-        try:
-            files = await self.hass.async_add_executor_job(
-                lambda: [
-                    f[:-5]  # strip .json
-                    for f in os.listdir(template_dir)
-                    if f.endswith(".json")
-                ] if os.path.exists(template_dir) else []
+        # Skip the listing job entirely once we know there is no template folder
+        if self._template_dir_exists is None:
+            self._template_dir_exists = await self.hass.async_add_executor_job(
+                os.path.isdir, template_dir
             )
-            templates = sorted(files)
-        except Exception as err:
-            _LOGGER.debug("Failed to list templates in %s: %s", template_dir, err)
-            templates = []
+        if not self._template_dir_exists:
+            return self.async_abort(reason="no_templates")
+
+        templates = self._templates
+        if templates is None:
+            cached = _TEMPLATE_LIST_CACHE.get(template_dir)
+            if cached and time.monotonic() - cached[1] < _TEMPLATE_LIST_TTL:
+                templates = cached[2]
+            else:
+                try:
+                    templates = await self.hass.async_add_executor_job(
+                        self._list_templates, template_dir
+                    )
+                except Exception as err:
+                    _LOGGER.debug("Failed to list templates in %s: %s", template_dir, err)
+                    templates = []
 
         if not templates:
             return self.async_abort(reason="no_templates")
+        self._templates = templates
 
         return self.async_show_form(
             step_id="load_template",
-            data_schema=vol.Schema({
-                vol.Required("template"): selector.SelectSelector(
-                    selector.SelectSelectorConfig(
-                        options=[selector.SelectOptionDict(value=t, label=t) for t in templates],
-                        mode=selector.SelectSelectorMode.DROPDOWN,
-                    )
-                )
-            }),
+            data_schema=self._get_template_schema(templates),
             description_placeholders={"templates": ", ".join(templates)},
         )
     # ------------------------------------------------------------------
@@ -313,19 +443,19 @@ class ProtocolWizardOptionsFlow(config_entries.OptionsFlow):
                     errors={"name": "required"},
                 )
     
-            protocol_subdir = "modbus" if self.protocol == CONF_PROTOCOL_MODBUS else "snmp"
-            template_dir = self.hass.config.path(
-                "custom_components", DOMAIN, "templates", protocol_subdir
-            )
-    
-            os.makedirs(template_dir, exist_ok=True)
-    
-            path = os.path.join(template_dir, f"{name}.json")
+            path = os.path.join(self._template_dir, f"{name}.json")
     
             try:
                 await self.hass.async_add_executor_job(
-                    self._write_template, path, self._entities
+                    self._ensure_and_write,
+                    path,
+                    self._entities,
+                    not self._template_dir_exists,
                 )
+                self._template_dir_exists = True
+                # New file: make the next listing re-read the folder
+                _TEMPLATE_LIST_CACHE.pop(self._template_dir, None)
+                self._templates = None
                 return self.async_abort(reason="template_exported")
     
             except Exception as err:
@@ -345,137 +475,349 @@ class ProtocolWizardOptionsFlow(config_entries.OptionsFlow):
     # ------------------------------------------------------------------
     def _get_template_schema(self, templates=None):
         """Return schema for template selection."""
-        if templates is None:
-            templates = []
-        return vol.Schema({
-            vol.Required("template"): selector.SelectSelector(
-                selector.SelectSelectorConfig(
-                    options=[selector.SelectOptionDict(value=t, label=t) for t in templates],
-                    mode=selector.SelectSelectorMode.DROPDOWN,
-                )
-            )
-        })
+        return _build_template_schema(tuple(templates or ()))
         
+    def _entity_options(self) -> list[selector.SelectOptionDict]:
+        """Return the entity dropdown options, rebuilt only after a change."""
+        count = len(self._entities)
+        if self._options_cache is None or self._options_cache[0] != count:
+            if self._labels is None:
+                format_label = self.schema_handler.format_label
+                self._labels = [format_label(e) for e in self._entities]
+            # Option values are list indices; keep their strings across rebuilds
+            if len(self._index_strs) < count:
+                self._index_strs.extend(str(i) for i in range(len(self._index_strs), count))
+            self._options_cache = (
+                count,
+                [
+                    selector.SelectOptionDict(
+                        value=self._index_strs[i],
+                        label=self._labels[i],
+                    )
+                    for i in range(count)
+                ],
+            )
+        return self._options_cache[1]
+
+    def _rebuild_entity_index(self) -> None:
+        """Recompute the (name, address) index after edits or deletes."""
+        self._entity_index = {(e.get("name"), e.get("address")): e for e in self._entities}
+
+    @staticmethod
+    def _list_templates(template_dir: str) -> list[str]:
+        """Return sorted template names (without .json) found in template_dir.
+
+        The listing is cached until the directory mtime changes (e.g. an export
+        adds a new file), so revisiting the step does not re-read the directory.
+        """
+        try:
+            mtime = os.stat(template_dir).st_mtime_ns
+        except FileNotFoundError:
+            return []
+
+        cached = _TEMPLATE_LIST_CACHE.get(template_dir)
+        if cached and cached[0] == mtime:
+            _TEMPLATE_LIST_CACHE[template_dir] = (mtime, time.monotonic(), cached[2])
+            return cached[2]
+
+        with os.scandir(template_dir) as it:
+            # Name test first; is_file() uses the cached dirent type (stat only for symlinks)
+            templates = [
+                e.name[:-5]  # strip .json
+                for e in it
+                if e.name.endswith(".json") and e.is_file()
+            ]
+        templates.sort()
+        _TEMPLATE_LIST_CACHE[template_dir] = (mtime, time.monotonic(), templates)
+        return templates
+
     @staticmethod
     def _load_template(path: str):
-        with open(path, "r", encoding="utf-8") as f:
-            return json.load(f)
+        with open(path, "rb") as f:
+            if orjson is not None and os.fstat(f.fileno()).st_size > _MMAP_TEMPLATE_SIZE:
+                # Large template: decode straight from the page cache, no extra copy
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, memoryview(mm) as view:
+                    return orjson.loads(view)
+            raw = f.read()
+        return orjson.loads(raw) if orjson is not None else json.loads(raw)
 
     def _save_entities(self):
-        options = dict(self._config_entry.options)
         config_key = CONF_REGISTERS if self.protocol == CONF_PROTOCOL_MODBUS else CONF_ENTITIES
-        options[config_key] = self._entities
-        self.hass.config_entries.async_update_entry(self._config_entry, options=options)
+        if self._config_entry.options.get(config_key, []) == self._entities:
+            # Nothing changed (e.g. an edit saved unchanged): no update, no reload
+            return
+
+        # Store a copy: _entities is mutated in place, and sharing the list with
+        # the entry would make the next update compare equal and be dropped
+        self.hass.config_entries.async_update_entry(
+            self._config_entry,
+            options={**self._config_entry.options, config_key: list(self._entities)},
+        )
+        self._options_cache = None
+
+        # Schedule (or re-schedule) a single reload for this burst of edits
+        if self._pending_reload_unsub is not None:
+            self._pending_reload_unsub()
+        self._pending_reload_unsub = async_call_later(self.hass, RELOAD_DELAY, self._do_reload)
+
+    @callback
+    def _do_reload(self, _now) -> None:
+        """Reload the entry once after the last pending entity save."""
+        self._pending_reload_unsub = None
         self.hass.async_create_task(
             self.hass.config_entries.async_reload(self._config_entry.entry_id)
         )
 
     def _save_options(self, updates: dict):
-        options = dict(self._config_entry.options)
-        options.update(updates)
-        self.hass.config_entries.async_update_entry(self._config_entry, options=options)
+        options = self._config_entry.options
+        if all(key in options and options[key] == value for key, value in updates.items()):
+            return
+        self.hass.config_entries.async_update_entry(
+            self._config_entry, options={**self._config_entry.options, **updates}
+        )
 
-    def _get_schema_handler(self):
+    @cached_property
+    def schema_handler(self):
+        """Protocol schema handler, built on first use (Settings/export need none)."""
         if self.protocol == CONF_PROTOCOL_SNMP:
             return SNMPSchemaHandler()
         return ModbusSchemaHandler()
 
 
+# ============================================================================
+# SCHEMA BUILDERS
+# ============================================================================
+
+# Static selectors shared by every form render
+_DEVICE_CLASS_SELECTOR = selector.SelectSelector(
+    selector.SelectSelectorConfig(
+        options=[" ", "temperature", "power", "energy", "voltage", "current", "frequency", "duration"],
+        mode=selector.SelectSelectorMode.DROPDOWN,
+    )
+)
+_STATE_CLASS_SELECTOR = selector.SelectSelector(
+    selector.SelectSelectorConfig(
+        options=[" ", "measurement", "total", "total_increasing"],
+        mode=selector.SelectSelectorMode.DROPDOWN,
+    )
+)
+_ENTITY_CATEGORY_SELECTOR = selector.SelectSelector(
+    selector.SelectSelectorConfig(
+        options=[" ", "diagnostic", "config", "system"],
+        mode=selector.SelectSelectorMode.DROPDOWN,
+    )
+)
+_REGISTER_TYPE_SELECTOR = selector.SelectSelector(
+    selector.SelectSelectorConfig(
+        options=["auto", "holding", "input", "coil", "discrete"],
+        mode=selector.SelectSelectorMode.DROPDOWN,
+    )
+)
+_MODBUS_DATA_TYPE_SELECTOR = selector.SelectSelector(
+    selector.SelectSelectorConfig(
+        options=[
+            "uint16", "int16",
+            "uint32", "int32",
+            "float32",
+            "uint64", "int64",
+        ],
+        mode=selector.SelectSelectorMode.DROPDOWN,
+    )
+)
+_RW_SELECTOR = selector.SelectSelector(
+    selector.SelectSelectorConfig(
+        options=["read", "write", "rw"],
+        mode=selector.SelectSelectorMode.DROPDOWN,
+    )
+)
+# Byte and word order share the same choices
+_ENDIAN_SELECTOR = selector.SelectSelector(
+    selector.SelectSelectorConfig(options=["big", "little"])
+)
+_SNMP_READ_MODE_SELECTOR = selector.SelectSelector(
+    selector.SelectSelectorConfig(
+        options=[
+            {"value": "get", "label": "Get (single value)"},
+            {"value": "walk", "label": "Walk (subtree table)"},
+        ],
+        mode=selector.SelectSelectorMode.DROPDOWN,
+    )
+)
+_SNMP_DATA_TYPE_SELECTOR = selector.SelectSelector(
+    selector.SelectSelectorConfig(
+        options=["string", "integer", "counter32", "counter64"],
+        mode=selector.SelectSelectorMode.DROPDOWN,
+    )
+)
+
+@lru_cache(maxsize=8)
+def _build_settings_schema(current: int, max_gap: int | None = None) -> vol.Schema:
+    # Coerce/Range rather than a custom callable: the frontend needs a serializable schema
+    schema = {
+        vol.Required(CONF_UPDATE_INTERVAL, default=current): vol.All(
+            vol.Coerce(int), vol.Range(min=5, max=300)
+        )
+    }
+    if max_gap is not None:  # Modbus only
+        schema[vol.Required(CONF_MAX_GAP, default=max_gap)] = vol.All(
+            vol.Coerce(int), vol.Range(min=0, max=100)
+        )
+    return vol.Schema(schema)
+
+
+@lru_cache(maxsize=8)
+def _build_template_schema(templates: tuple[str, ...]) -> vol.Schema:
+    return vol.Schema({
+        vol.Required("template"): selector.SelectSelector(
+            selector.SelectSelectorConfig(
+                options=[selector.SelectOptionDict(value=t, label=t) for t in templates],
+                mode=selector.SelectSelectorMode.DROPDOWN,
+            )
+        )
+    })
+
+
+# Entity fields each schema reads its defaults from (the cache key)
+_MODBUS_SCHEMA_FIELDS = (
+    "name", "address", CONF_REGISTER_TYPE, "data_type", "rw",
+    "device_class", "state_class", "entity_category", "icon", "unit",
+    "format", "scale", "offset", "options", CONF_BYTE_ORDER, CONF_WORD_ORDER,
+)
+_SNMP_SCHEMA_FIELDS = (
+    "name", "address", "data_type",
+    "device_class", "state_class", "entity_category", "icon",
+    "scale", "offset", "format",
+)
+
+
+def _cached_schema(builder, fields: tuple[str, ...], defaults: Mapping | None) -> vol.Schema:
+    """Return the schema for these defaults, reusing a cached one when possible."""
+    if defaults is None:
+        defaults = {}
+    key = tuple((k, defaults[k]) for k in fields if k in defaults)
+    try:
+        return builder(key)
+    except TypeError:
+        # Unhashable default value: build without caching
+        return builder.__wrapped__(key)
+
+
+def _common_optional_fields(defaults: dict) -> dict:
+    """Presentation fields shared by every protocol's entity form."""
+    return {
+        vol.Optional("device_class", default=defaults.get("device_class", " ")): _DEVICE_CLASS_SELECTOR,
+        vol.Optional("state_class", default=defaults.get("state_class", " ")): _STATE_CLASS_SELECTOR,
+        vol.Optional("entity_category", default=defaults.get("entity_category", " ")): _ENTITY_CATEGORY_SELECTOR,
+        vol.Optional("icon", default=defaults.get("icon", "")): str,  # e.g. mdi:thermometer
+    }
+
+
+@lru_cache(maxsize=32)
+def _build_modbus_schema(defaults_key: tuple) -> vol.Schema:
+    defaults = dict(defaults_key)
+
+    schema = {
+        vol.Required("name", default=defaults.get("name")): str,
+
+        vol.Required("address", default=defaults.get("address")):
+            vol.All(vol.Coerce(int), vol.Range(min=0, max=65535)),
+        
+        vol.Required(
+            CONF_REGISTER_TYPE,
+            default=defaults.get(CONF_REGISTER_TYPE, "input")
+        ):
+            _REGISTER_TYPE_SELECTOR,
+        vol.Required("data_type", default=defaults.get("data_type", "uint16")):
+            _MODBUS_DATA_TYPE_SELECTOR,
+
+        vol.Required("rw", default=defaults.get("rw", "read")):
+            _RW_SELECTOR,
+        **_common_optional_fields(defaults),
+        vol.Optional("unit", default=defaults.get("unit", "")): str,
+        vol.Optional("min", default=0.0): vol.Coerce(float),
+        vol.Optional("max", default=65535.0 if "uint" in defaults.get("data_type", "") else 100.0): vol.Coerce(float),
+        vol.Optional("step", default=0.1 if "float" in defaults.get("data_type", "") else 1.0): vol.Coerce(float),
+        vol.Optional("format", default=defaults.get("format", "")): str,
+        vol.Optional("scale", default=defaults.get("scale", 1.0)): vol.Coerce(float),
+        vol.Optional("offset", default=defaults.get("offset", 0.0)): vol.Coerce(float),
+        vol.Optional("options", default=defaults.get("options", "")): str,   # options: JSON string mapping raw values to labels
+        vol.Optional(
+            CONF_BYTE_ORDER,
+            default=defaults.get(CONF_BYTE_ORDER, "big")
+        ):
+            _ENDIAN_SELECTOR,
+
+        vol.Optional(
+            CONF_WORD_ORDER,
+            default=defaults.get(CONF_WORD_ORDER, "big")
+        ):
+            _ENDIAN_SELECTOR,
+
+    }
+
+    return vol.Schema(schema)
+
+
+@lru_cache(maxsize=32)
+def _build_snmp_schema(defaults_key: tuple) -> vol.Schema:
+    defaults = dict(defaults_key)
+    return vol.Schema({
+        vol.Required("name", default=defaults.get("name")): str,
+        vol.Required("address", default=defaults.get("address")): str,
+        vol.Optional("read_mode", default="get"): _SNMP_READ_MODE_SELECTOR,
+        vol.Required("data_type", default=defaults.get("data_type", "string")):
+            _SNMP_DATA_TYPE_SELECTOR,
+        **_common_optional_fields(defaults),
+        vol.Optional("scale", default=defaults.get("scale", 1.0)): vol.Coerce(float),
+        vol.Optional("offset", default=defaults.get("offset", 0.0)): vol.Coerce(float),
+        vol.Optional("format", default=defaults.get("format", "")): str,
+    })
+
+
 # ============================================================================
 # SCHEMA HANDLERS
 # ============================================================================
 
-class ModbusSchemaHandler:
+class _BaseSchemaHandler:
+    """Behaviour shared by all protocol schema handlers."""
+
+    __slots__ = ()  # stateless; no per-instance dict
+
+    def format_label(self, entity):
+        return f"{entity.get('name')} @ {entity.get('address')}"
+
+    def merge_template(self, entities, template, index):
+        """Append template entities not yet present; index is updated in place.
+
+        The index is updated as entries are added, so duplicates within the
+        template itself are skipped as well. Entries that are not objects or
+        lack a name/address are ignored.
+        """
+        new = []
+        append = new.append
+        for e in template:
+            if not isinstance(e, dict):
+                continue
+            key = (e.get("name"), e.get("address"))
+            if key[0] is None or key[1] is None or key in index:
+                continue
+            if CONF_DETECTED_TYPE in e:
+                e = {k: v for k, v in e.items() if k != CONF_DETECTED_TYPE}
+            index[key] = e
+            append(e)
+        entities.extend(new)
+        return len(new)
+
+
+class ModbusSchemaHandler(_BaseSchemaHandler):
     """Handles Modbus-specific schema and input processing."""
 
+    __slots__ = ()
+
             
     @staticmethod
     def get_schema(defaults: dict | None = None) -> vol.Schema:
-        defaults = defaults or {}
-
-        schema = {
-            vol.Required("name", default=defaults.get("name")): str,
-
-            vol.Required("address", default=defaults.get("address")):
-                vol.All(vol.Coerce(int), vol.Range(min=0, max=65535)),
-            
-            vol.Required(
-                CONF_REGISTER_TYPE,
-                default=defaults.get(CONF_REGISTER_TYPE, "input")
-            ):
-                selector.SelectSelector(
-                    selector.SelectSelectorConfig(
-                        options=["auto", "holding", "input", "coil", "discrete"],
-                        mode=selector.SelectSelectorMode.DROPDOWN,
-                    )
-                ),
-            vol.Required("data_type", default=defaults.get("data_type", "uint16")):
-                selector.SelectSelector(
-                    selector.SelectSelectorConfig(
-                        options=[
-                            "uint16", "int16",
-                            "uint32", "int32",
-                            "float32",
-                            "uint64", "int64",
-                        ],
-                        mode=selector.SelectSelectorMode.DROPDOWN,
-                    )
-                ),
-
-            vol.Required("rw", default=defaults.get("rw", "read")):
-                selector.SelectSelector(
-                    selector.SelectSelectorConfig(
-                        options=["read", "write", "rw"],
-                        mode=selector.SelectSelectorMode.DROPDOWN,
-                    )
-                ),
-            vol.Optional("device_class", default=defaults.get("device_class", " ")): selector.SelectSelector(
-                selector.SelectSelectorConfig(
-                    options=[" ", "temperature", "power", "energy", "voltage", "current", "frequency", "duration"],
-                    mode=selector.SelectSelectorMode.DROPDOWN,
-                )
-            ),
-            vol.Optional("state_class", default=defaults.get("state_class", " ")): selector.SelectSelector(
-                selector.SelectSelectorConfig(
-                    options=[" ", "measurement", "total", "total_increasing"],
-                    mode=selector.SelectSelectorMode.DROPDOWN,
-                )
-            ),
-            vol.Optional("entity_category", default=defaults.get("entity_category", " ")): selector.SelectSelector(
-                selector.SelectSelectorConfig(
-                    options=[" ", "diagnostic", "config", "system"],
-                    mode=selector.SelectSelectorMode.DROPDOWN,
-                )
-            ),
-            vol.Optional("icon", default=defaults.get("icon", "")): str,  # e.g. mdi:thermometer
-            vol.Optional("unit", default=defaults.get("unit", "")): str,
-            vol.Optional("min", default=0.0): vol.Coerce(float),
-            vol.Optional("max", default=65535.0 if "uint" in defaults.get("data_type", "") else 100.0): vol.Coerce(float),
-            vol.Optional("step", default=0.1 if "float" in defaults.get("data_type", "") else 1.0): vol.Coerce(float),
-            vol.Optional("format", default=defaults.get("format", "")): str,
-            vol.Optional("scale", default=defaults.get("scale", 1.0)): vol.Coerce(float),
-            vol.Optional("offset", default=defaults.get("offset", 0.0)): vol.Coerce(float),
-            vol.Optional("options", default=defaults.get("options", "")): str,   # options: JSON string mapping raw values to labels
-            vol.Optional(
-                CONF_BYTE_ORDER,
-                default=defaults.get(CONF_BYTE_ORDER, "big")
-            ):
-                selector.SelectSelector(
-                    selector.SelectSelectorConfig(options=["big", "little"])
-                ),
-
-            vol.Optional(
-                CONF_WORD_ORDER,
-                default=defaults.get(CONF_WORD_ORDER, "big")
-            ):
-                selector.SelectSelector(
-                    selector.SelectSelectorConfig(options=["big", "little"])
-                ),
-
-        }
-
-
-        return vol.Schema(schema)
+        return _cached_schema(_build_modbus_schema, _MODBUS_SCHEMA_FIELDS, defaults)
 
     @staticmethod
     def process_input(user_input: dict, errors: dict, existing: dict | None = None) -> dict | None:
@@ -490,6 +832,8 @@ class ModbusSchemaHandler:
         
         # Start with existing data (for edits) or empty dict
         processed = dict(existing) if existing else {}
+        # The edit may change address or type: let "auto" probe again
+        processed.pop(CONF_DETECTED_TYPE, None)
         if "options" in processed and isinstance(processed["options"], str):
             try:
                 processed["options"] = json.loads(processed["options"])
@@ -499,20 +843,13 @@ class ModbusSchemaHandler:
                 errors["options"] = ""
         # Update with new values, handling empty strings properly
         for key, value in user_input.items():
-            if value in (" ","", None):
+            if value in _EMPTY_VALUES:
                 processed.pop(key, None)  # Clear if empty
             elif value is not None:
                 processed[key] = value        
         # Calculate size based on data_type
-        type_sizes = {
-            "uint16": 1, "int16": 1,
-            "uint32": 2, "int32": 2,
-            "float32": 2,
-            "uint64": 4, "int64": 4,
-        }
-        dtype = processed.get("data_type")
-        if dtype in type_sizes:
-            processed["size"] = type_sizes[dtype]
+        if (size := TYPE_SIZES.get(processed.get("data_type"))) is not None:
+            processed["size"] = size
         
         # Convert types
         try:
@@ -539,92 +876,23 @@ class ModbusSchemaHandler:
     def get_defaults(self, entity):
         """
         Get defaults for editing an entity.
-        Returns the entity dict with all fields, using empty string for missing optional fields.
+        Returns a read-only view of the entity, falling back to empty values for
+        missing optional fields (so the form shows them empty rather than None).
         """
-        defaults = dict(entity)
-        
-        # Set empty string for optional fields that don't exist
-        # (so form shows them as empty rather than None)
-        defaults.setdefault("device_class", " ") # to ensure it work in dropdown
-        defaults.setdefault("state_class", " ")
-        defaults.setdefault("entity_category", " ")
-        defaults.setdefault("icon", "")
-        defaults.setdefault("unit", "")
-        defaults.setdefault("format", "")
-        opts = defaults.get("options")
+        opts = entity.get("options")
         if isinstance(opts, dict):
-            defaults["options"] = json.dumps(opts)
-        else:
-            defaults.setdefault("options", "")
-        
-        # Ensure numeric fields have values
-        defaults.setdefault("scale", 1.0)
-        defaults.setdefault("offset", 0.0)
-        
-        return defaults
-
-    def format_label(self, entity):
-        return f"{entity.get('name')} @ {entity.get('address')}"
-
-    def merge_template(self, entities, template):
-        added = 0
-        existing = {(e.get("name"), e.get("address")) for e in entities}
-        for e in template:
-            key = (e.get("name"), e.get("address"))
-            if key not in existing:
-                entities.append(e)
-                added += 1
-        return added
-
+            # Options are edited as JSON text; nothing to encode when empty
+            layer = {"options": json.dumps(opts)} if opts else _NO_OPTIONS
+            return MappingProxyType(ChainMap(layer, entity, _MODBUS_FORM_DEFAULTS))
+        return MappingProxyType(ChainMap(entity, _MODBUS_FORM_DEFAULTS))
 
 
-class SNMPSchemaHandler:
+class SNMPSchemaHandler(_BaseSchemaHandler):
+    __slots__ = ()
     config_key = CONF_ENTITIES
             
     def get_schema(self, defaults=None):
-        defaults = defaults or {}
-        return vol.Schema({
-            vol.Required("name", default=defaults.get("name")): str,
-            vol.Required("address", default=defaults.get("address")): str,
-            vol.Optional("read_mode", default="get"): selector.SelectSelector(
-                selector.SelectSelectorConfig(
-                    options=[
-                        {"value": "get", "label": "Get (single value)"},
-                        {"value": "walk", "label": "Walk (subtree table)"},
-                    ],
-                    mode=selector.SelectSelectorMode.DROPDOWN,
-                )
-            ),
-            vol.Required("data_type", default=defaults.get("data_type", "string")):
-                selector.SelectSelector(
-                    selector.SelectSelectorConfig(
-                        options=["string", "integer", "counter32", "counter64"],
-                        mode=selector.SelectSelectorMode.DROPDOWN,
-                    )
-                ),
-            vol.Optional("device_class", default=defaults.get("device_class", " ")): selector.SelectSelector(
-                selector.SelectSelectorConfig(
-                    options=[" ", "temperature", "power", "energy", "voltage", "current", "frequency", "duration"],
-                    mode=selector.SelectSelectorMode.DROPDOWN,
-                )
-            ),
-            vol.Optional("state_class", default=defaults.get("state_class", " ")): selector.SelectSelector(
-                selector.SelectSelectorConfig(
-                    options=[" ", "measurement", "total", "total_increasing"],
-                    mode=selector.SelectSelectorMode.DROPDOWN,
-                )
-            ),
-            vol.Optional("entity_category", default=defaults.get("entity_category", " ")): selector.SelectSelector(
-                selector.SelectSelectorConfig(
-                    options=[" ", "diagnostic", "config", "system"],
-                    mode=selector.SelectSelectorMode.DROPDOWN,
-                )
-            ),
-            vol.Optional("icon", default=defaults.get("icon", "")): str,  # e.g. mdi:thermometer
-            vol.Optional("scale", default=defaults.get("scale", 1.0)): vol.Coerce(float),
-            vol.Optional("offset", default=defaults.get("offset", 0.0)): vol.Coerce(float),
-            vol.Optional("format", default=defaults.get("format", "")): str,
-        })
+        return _cached_schema(_build_snmp_schema, _SNMP_SCHEMA_FIELDS, defaults)
 
     
 
@@ -648,7 +916,7 @@ class SNMPSchemaHandler:
         
         # Update with new values, handling empty strings properly
         for key, value in user_input.items():
-            if value in (" ","", None):
+            if value in _EMPTY_VALUES:
                 processed.pop(key, None)  # Clear if empty
             elif value is not None:
                 processed[key] = value        
@@ -673,36 +941,7 @@ class SNMPSchemaHandler:
     def get_defaults(self, entity):
         """
         Get defaults for editing an entity.
-        Returns the entity dict with all fields, using empty string for missing optional fields.
+        Returns a read-only view of the entity, falling back to empty values for
+        missing optional fields.
         """
-        defaults = dict(entity)
-        
-        # Set empty string for optional fields that don't exist
-        defaults.setdefault("device_class", " ")  # to ensure it work in dropdown
-        defaults.setdefault("state_class", " ")
-        defaults.setdefault("entity_category", " ")
-        defaults.setdefault("icon", "")
-        defaults.setdefault("format", "")
-        
-        # Ensure numeric fields have values
-        defaults.setdefault("scale", 1.0)
-        defaults.setdefault("offset", 0.0)
-        
-        # Ensure required fields
-        defaults.setdefault("read_mode", "get")
-        defaults.setdefault("data_type", "string")
-        
-        return defaults
-
-    def format_label(self, entity):
-        return f"{entity.get('name')} @ {entity.get('address')}"
-
-    def merge_template(self, entities, template):
-        added = 0
-        existing = {(e.get("name"), e.get("address")) for e in entities}
-        for e in template:
-            key = (e.get("name"), e.get("address"))
-            if key not in existing:
-                entities.append(e)
-                added += 1
-        return added
+        return MappingProxyType(ChainMap(entity, _SNMP_FORM_DEFAULTS))
@@ -8,7 +8,9 @@ from __future__ import annotations
 
 import logging
 from abc import ABC, abstractmethod
-from typing import Any
+from functools import lru_cache
+from string import Formatter
+from typing import Any, Self
 from datetime import timedelta
 
 from homeassistant.core import HomeAssistant
@@ -51,10 +53,43 @@ class BaseProtocolClient(ABC):
         """Connection status."""
         pass
 
+    async def __aenter__(self) -> Self:
+        """Connect for the duration of an async with block (check is_connected)."""
+        await self.connect()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        """Disconnect when the block exits, also on errors."""
+        await self.disconnect()
+
 class _SafeFormatDict(dict):
     """Returns placeholder unchanged if key is missing."""
     def __missing__(self, key):
         return "{" + key + "}"
+
+_TIME_FIELDS = frozenset(("d", "h", "m", "s"))
+_CASE_FIELDS = frozenset(("upper", "lower"))
+_KNOWN_FIELDS = frozenset(("", "value")) | _TIME_FIELDS | _CASE_FIELDS
+
+@lru_cache(maxsize=512)
+def _compile_format(format_str: str) -> tuple[bool, bool, bool]:
+    """
+    Parse a format string once and return (wants_time, wants_case, has_unknown):
+    whether it uses any of {d}/{h}/{m}/{s}, {upper}/{lower}, or any other field.
+    """
+    names = set()
+    try:
+        for _, field, _, _ in Formatter().parse(format_str):
+            if field is not None:
+                names.add(field.split(".", 1)[0].split("[", 1)[0])
+    except ValueError:
+        # Malformed: provide everything and let format_map report it
+        return True, True, True
+    return (
+        not _TIME_FIELDS.isdisjoint(names),
+        not _CASE_FIELDS.isdisjoint(names),
+        not names <= _KNOWN_FIELDS,
+    )
             
 class BaseProtocolCoordinator(DataUpdateCoordinator, ABC):
     """Abstract coordinator for any protocol."""
@@ -86,6 +121,9 @@ class BaseProtocolCoordinator(DataUpdateCoordinator, ABC):
         
         Should return a dict where keys are entity identifiers
         and values are the decoded/processed values.
+
+        Request all entities of a cycle together where the client supports it
+        (e.g. ModbusClient.read_many) so nearby addresses share one request.
         """
         pass
     
@@ -118,35 +156,41 @@ class BaseProtocolCoordinator(DataUpdateCoordinator, ABC):
         pass
 
     def _format_value(self, value: Any, entity_config: dict) -> Any:
-        format_str = str(entity_config.get("format", "")).strip()
+        # Most entities have no format: bail out before any string work
+        format_str = entity_config.get("format")
+        if not format_str:
+            return value
+        format_str = str(format_str).strip()
         if not format_str:
             return value
     
-        _LOGGER.debug(
-            "Formatting value %s with format '%s'", value, format_str
-        )
+        if _LOGGER.isEnabledFor(logging.DEBUG):
+            _LOGGER.debug(
+                "Formatting value %s with format '%s'", value, format_str
+            )
     
         try:
-            ctx = _SafeFormatDict(value=value)
+            wants_time, wants_case, has_unknown = _compile_format(format_str)
+            # Only unknown placeholders need the pass-through dict; a known
+            # field left unset raises KeyError and falls back to the raw value
+            ctx = _SafeFormatDict(value=value) if has_unknown else {"value": value}
     
             # ---------- TRY NUMERIC ----------
             numeric = None
-            try:
-                numeric = float(value)
-            except (TypeError, ValueError):
-                pass
+            if wants_time:
+                try:
+                    numeric = float(value)
+                except (TypeError, ValueError):
+                    pass
     
             if numeric is not None:
-                total = int(numeric)
-                ctx.update({
-                    "d": total // 86400,
-                    "h": (total % 86400) // 3600,
-                    "m": (total % 3600) // 60,
-                    "s": total % 60,
-                })
+                d, rest = divmod(int(numeric), 86400)
+                h, rest = divmod(rest, 3600)
+                m, s = divmod(rest, 60)
+                ctx.update(d=d, h=h, m=m, s=s)
     
             # ---------- STRING HELPERS ----------
-            if isinstance(value, str):
+            if wants_case and isinstance(value, str):
                 ctx["upper"] = value.upper()
                 ctx["lower"] = value.lower()
     
@@ -159,11 +203,12 @@ class BaseProtocolCoordinator(DataUpdateCoordinator, ABC):
             return result
     
         except Exception as err:
-            _LOGGER.debug(
-                "Format error for entity '%s': %s",
-                entity_config.get("name"),
-                err,
-            )
+            if _LOGGER.isEnabledFor(logging.DEBUG):
+                _LOGGER.debug(
+                    "Format error for entity '%s': %s",
+                    entity_config.get("name"),
+                    err,
+                )
             return value
 
     
@@ -213,6 +258,8 @@ class BaseProtocolCoordinator(DataUpdateCoordinator, ABC):
         """
         Ensure client is connected.
         Default implementation - protocols can override if needed.
+        The transport may be shared with other entries, so the client is
+        asked every time rather than trusting a per-coordinator flag.
         """
         if self.client.is_connected:
             return True
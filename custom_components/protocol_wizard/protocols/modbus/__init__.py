@@ -4,6 +4,6 @@
 """Modbus protocol plugin."""
 from .coordinator import ModbusCoordinator
 from .client import ModbusClient
-from .const import CONF_ENTITIES, TYPE_SIZES, reg_key
+from .const import CONF_DETECTED_TYPE, CONF_ENTITIES, CONF_MAX_GAP, DEFAULT_MAX_GAP, TYPE_SIZES, TYPE_STRUCT, reg_key
 
-__all__ = ["ModbusCoordinator", "ModbusClient", "CONF_ENTITIES", "TYPE_SIZES", "reg_key"]
+__all__ = ["ModbusCoordinator", "ModbusClient", "CONF_DETECTED_TYPE", "CONF_ENTITIES", "CONF_MAX_GAP", "DEFAULT_MAX_GAP", "TYPE_SIZES", "TYPE_STRUCT", "reg_key"]
@@ -5,14 +5,62 @@
 from __future__ import annotations
 
 import logging
+import socket
+import time
+from collections.abc import Awaitable, Callable, Hashable, Iterable
 from typing import Any
 
 # from pymodbus.client import AsyncModbusSerialClient, AsyncModbusTcpClient, AsyncModbusUdpClient
+from pymodbus.exceptions import ModbusException
 
 from ..base import BaseProtocolClient
+from .const import DEFAULT_MAX_GAP
 
 _LOGGER = logging.getLogger(__name__)
 
+# Modbus PDU limits for a single read request
+MAX_READ_REGISTERS = 125
+MAX_READ_BITS = 2000
+
+_BIT_TYPES = ("coil", "discrete")
+
+# Wait after a failed connect, doubling per failure (seconds)
+RECONNECT_BACKOFF_MIN = 0.5
+RECONNECT_BACKOFF_MAX = 30.0
+
+# Seconds before a merged block the device rejected is tried as one read again
+SPLIT_BLOCK_RETRY = 3600.0
+
+# (spec id, register type, address, count) as accepted by read_many
+ReadSpec = tuple[Hashable, str, int, int]
+
+
+def plan_reads(
+    specs: Iterable[ReadSpec], max_gap: int = DEFAULT_MAX_GAP
+) -> list[tuple[str, int, int, list[tuple[Hashable, int, int]]]]:
+    """
+    Merge read requests into as few block reads as possible.
+
+    Requests of the same register type whose ranges overlap or are at most
+    max_gap apart share one block, as long as the block stays within the
+    Modbus PDU limit. Returns (register_type, start, count, members) per block,
+    each member being (spec_id, offset into the block, count).
+    """
+    blocks: list[list] = []
+    current = None
+    for spec_id, reg_type, address, count in sorted(specs, key=lambda s: (s[1], s[2])):
+        if current is not None and current[0] == reg_type:
+            start, end = current[1], current[1] + current[2]
+            new_end = max(end, address + count)
+            limit = MAX_READ_BITS if reg_type in _BIT_TYPES else MAX_READ_REGISTERS
+            if address - end <= max_gap and new_end - start <= limit:
+                current[2] = new_end - start
+                current[3].append((spec_id, address - start, count))
+                continue
+        current = [reg_type, address, count, [(spec_id, 0, count)]]
+        blocks.append(current)
+    return [tuple(block) for block in blocks]
+
 
 class ModbusClient(BaseProtocolClient):
     """Wrapper for pymodbus clients to match BaseProtocolClient interface."""
@@ -27,16 +75,54 @@ class ModbusClient(BaseProtocolClient):
         """
         self._client = pymodbus_client
         self.slave_id = int(slave_id)
+        # Bound pymodbus methods per register type, resolved once (in auto-detect order)
+        self._readers = {
+            "holding": pymodbus_client.read_holding_registers,
+            "input": pymodbus_client.read_input_registers,
+            "coil": pymodbus_client.read_coils,
+            "discrete": pymodbus_client.read_discrete_inputs,
+        }
+        # (single value, list of values, value coercion) per writable register type
+        self._writers = {
+            "coil": (pymodbus_client.write_coil, pymodbus_client.write_coils, bool),
+            "holding": (pymodbus_client.write_register, pymodbus_client.write_registers, int),
+        }
+        self._backoff = 0.0
+        self._last_failure = 0.0
     
     async def connect(self) -> bool:
-        """Establish connection."""
+        """Establish connection; returns False without trying while backing off."""
+        if self._backoff and time.monotonic() - self._last_failure < self._backoff:
+            return False
         try:
             await self._client.connect()
-            return self._client.connected
+            connected = self._client.connected
         except Exception as err:
             _LOGGER.error("Modbus connection failed: %s", err)
-            return False
+            connected = False
+
+        if connected:
+            self._backoff = 0.0
+            self._tune_socket()
+        else:
+            self._last_failure = time.monotonic()
+            self._backoff = min(max(self._backoff * 2, RECONNECT_BACKOFF_MIN), RECONNECT_BACKOFF_MAX)
+        return connected
     
+    def _tune_socket(self) -> None:
+        """
+        Enable TCP keepalive so a silently dropped connection is noticed.
+
+        asyncio already sets TCP_NODELAY on TCP transports; serial and UDP
+        transports have no TCP socket and are left alone.
+        """
+        try:
+            sock = self._client.ctx.transport.get_extra_info("socket")
+            if sock is not None and sock.type == socket.SOCK_STREAM:
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+        except (AttributeError, OSError) as err:
+            _LOGGER.debug("Could not tune Modbus socket: %s", err)
+
     async def disconnect(self) -> None:
         """Close connection."""
         try:
@@ -57,68 +143,122 @@ class ModbusClient(BaseProtocolClient):
         count = int(kwargs.get("count", 1))
         reg_type = kwargs.get("register_type", "holding")
         
-        method_map = {
-            "holding": self._client.read_holding_registers,
-            "input": self._client.read_input_registers,
-            "coil": self._client.read_coils,
-            "discrete": self._client.read_discrete_inputs,
-        }
-        
-        method = method_map.get(reg_type)
+        method = self._readers.get(reg_type)
         if not method:
             raise ValueError(f"Invalid register type: {reg_type}")
         
         result = await method(
             address=addr,
             count=count,
-            device_id=int(self.slave_id),
+            device_id=self.slave_id,
         )
         
         if result.isError():
             return None
         
-        # Return registers or bits depending on type
-        if reg_type in ("coil", "discrete"):
-            return result.bits[:count]
-        return result.registers[:count]
+        # Return registers or bits depending on type; registers normally come
+        # back exactly sized, bits are padded to whole bytes
+        values = result.bits if reg_type in _BIT_TYPES else result.registers
+        return values if len(values) == count else values[:count]
     
+    async def read_many(
+        self,
+        specs: Iterable[ReadSpec],
+        max_gap: int = DEFAULT_MAX_GAP,
+        max_failures: int | None = None,
+        split_blocks: dict[tuple[str, int, int], float] | None = None,
+    ) -> dict[Hashable, list | None]:
+        """
+        Read many ranges with as few Modbus requests as possible.
+
+        Ranges are merged into block reads (see plan_reads) and each response is
+        sliced back per spec. If a merged block fails, its specs are retried one
+        by one. Pass split_blocks to remember blocks the device rejected (e.g.
+        the gap covers unmapped registers) across calls: they are added as
+        (register_type, start, count) -> monotonic time and read per spec
+        straight away until SPLIT_BLOCK_RETRY has passed. Blocks that failed on
+        the transport (timeout, lost connection) are not remembered.
+
+        Returns spec_id -> values, or None for specs that could not be read.
+        Stops early after max_failures consecutive transport failures; error
+        responses come from a live device and do not count. Specs skipped
+        because of that are left out of the result.
+        """
+        results: dict[Hashable, list | None] = {}
+        failures = 0
+        now = time.monotonic()
+        if split_blocks:
+            for expired in [b for b, split_at in split_blocks.items() if now - split_at >= SPLIT_BLOCK_RETRY]:
+                del split_blocks[expired]
+
+        async def read_block(reg_type: str, address: int, count: int) -> tuple[list | None, bool]:
+            """Return (values, rejected by the device)."""
+            nonlocal failures
+            try:
+                values = await self.read(address, count=count, register_type=reg_type)
+            except (ModbusException, OSError) as err:  # timeouts, connection errors
+                _LOGGER.debug("Modbus %s read at %s (%d) failed: %s", reg_type, address, count, err)
+                failures += 1
+                return None, False
+            except ValueError as err:  # invalid register type
+                _LOGGER.debug("Modbus %s read at %s (%d) failed: %s", reg_type, address, count, err)
+                return None, True
+            failures = 0
+            return values, values is None
+
+        for reg_type, start, count, members in plan_reads(specs, max_gap):
+            if max_failures is not None and failures >= max_failures:
+                break
+
+            block = (reg_type, start, count)
+            if len(members) > 1 and split_blocks is not None and block in split_blocks:
+                values = None
+            else:
+                values, rejected = await read_block(reg_type, start, count)
+                if values is None and rejected and len(members) > 1 and split_blocks is not None:
+                    split_blocks[block] = now
+            if values is None and len(members) > 1:
+                for spec_id, offset, n in members:
+                    if max_failures is not None and failures >= max_failures:
+                        break
+                    results[spec_id], _ = await read_block(reg_type, start + offset, n)
+                continue
+
+            for spec_id, offset, n in members:
+                if values is None or (offset == 0 and n == len(values)):
+                    # Failed, or the block is exactly this spec: no slice copy
+                    results[spec_id] = values
+                else:
+                    results[spec_id] = values[offset:offset + n]
+
+        return results
+
     async def write(self, address: str, value: Any, **kwargs) -> bool:
         addr = int(address)
         reg_type = kwargs.get("register_type", "holding").lower()
      #   _LOGGER.debug("write called: addr=%s, value=%r (type=%s), reg_type=%s", addr, value, type(value).__name__, reg_type)
-        try:
-            if reg_type == "coil":
-                if isinstance(value, list):
-                    result = await self._client.write_coils(
-                        address=addr,
-                        values=[bool(v) for v in value],
-                        device_id=self.slave_id,
-                    )
-                else:
-                    result = await self._client.write_coil(
-                        address=addr,
-                        value=bool(value),
-                        device_id=self.slave_id,
-                    )
-            elif reg_type == "holding":
-                if isinstance(value, list):
-                    result = await self._client.write_registers(
-                        address=addr,
-                        values=[int(v) for v in value],
-                        device_id=self.slave_id,
-                    )
-                else:
-                    result = await self._client.write_register(
-                        address=addr,
-                        value=int(value),
-                        device_id=self.slave_id,
-                    )
-            elif reg_type in ("input", "discrete"):
+        writers = self._writers.get(reg_type)
+        if writers is None:
+            if reg_type in ("input", "discrete"):
                 _LOGGER.error("Cannot write to read-only %s registers", reg_type)
-                return False
             else:
                 _LOGGER.error("Unsupported register_type '%s'", reg_type)
-                return False
+            return False
+
+        write_one, write_list, convert = writers
+        try:
+            if isinstance(value, list):
+                result = await write_list(
+                    address=addr,
+                    values=[convert(v) for v in value],
+                    device_id=self.slave_id,
+                )
+            else:
+                result = await write_one(
+                    address=addr,
+                    value=convert(value),
+                    device_id=self.slave_id,
+                )
 
             return not result.isError()
 
@@ -131,6 +271,11 @@ class ModbusClient(BaseProtocolClient):
         """Check if connected."""
         return self._client.connected
     
+    @property
+    def readers(self) -> dict[str, Callable[..., Awaitable[Any]]]:
+        """Bound pymodbus read method per register type, in auto-detect order."""
+        return self._readers
+
     # Expose underlying client for protocol-specific methods
     @property
     def raw_client(self):
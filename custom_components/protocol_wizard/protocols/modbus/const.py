@@ -2,10 +2,20 @@
 #-- protocol modbus const.py protocol wizard
 #------------------------------------------
 """Modbus-specific constants."""
+from functools import lru_cache
+from types import MappingProxyType
 
 CONF_ENTITIES = "registers"
 
-TYPE_SIZES = {
+# Unrequested registers/bits allowed inside one merged read (0: only adjacent ranges)
+CONF_MAX_GAP = "max_register_gap"
+DEFAULT_MAX_GAP = 8
+
+# Register type found by probing, stored on entities configured as "auto"
+CONF_DETECTED_TYPE = "detected_register_type"
+
+# Registers per data type (read-only: shared by the flow and the coordinator)
+TYPE_SIZES = MappingProxyType({
     "uint16": 1,
     "int16": 1,
     "uint32": 2,
@@ -13,8 +23,20 @@ TYPE_SIZES = {
     "float32": 2,
     "uint64": 4,
     "int64": 4,
-}
+})
+
+# struct format per fixed-size data type (registers are big-endian words)
+TYPE_STRUCT = MappingProxyType({
+    "uint16": ">H",
+    "int16": ">h",
+    "uint32": ">I",
+    "int32": ">i",
+    "float32": ">f",
+    "uint64": ">Q",
+    "int64": ">q",
+})
 
+@lru_cache(maxsize=1024)
 def reg_key(name: str) -> str:
     """Generate consistent key from register name."""
     return name.lower().strip().replace(" ", "_")
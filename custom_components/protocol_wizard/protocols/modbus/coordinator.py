@@ -6,17 +6,21 @@ from __future__ import annotations
 
 import logging
 import asyncio
+import struct
+import sys
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
 from typing import Any
 from datetime import timedelta
 
 from homeassistant.core import HomeAssistant
 from homeassistant.config_entries import ConfigEntry
-from pymodbus.client.mixin import ModbusClientMixin
 
 from ..base import BaseProtocolCoordinator
 from .. import ProtocolRegistry
 from .client import ModbusClient
-from .const import CONF_ENTITIES, TYPE_SIZES, reg_key
+from .const import CONF_DETECTED_TYPE, CONF_ENTITIES, CONF_MAX_GAP, DEFAULT_MAX_GAP, TYPE_SIZES, TYPE_STRUCT, reg_key
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -25,6 +29,41 @@ _LOGGER = logging.getLogger(__name__)
 logging.getLogger("pymodbus").setLevel(logging.CRITICAL)
 logging.getLogger("pymodbus.logging").setLevel(logging.CRITICAL)
 
+# Decoders for the fixed-size register types over big-endian register bytes
+_STRUCTS = {data_type: struct.Struct(fmt) for data_type, fmt in TYPE_STRUCT.items()}
+_REGISTER_PACKERS = {n: struct.Struct(f">{n}H") for n in (1, 2, 4)}
+
+
+def _registers_to_bytes(registers: list[int], little_word_order: bool = False) -> bytes:
+    """Pack 16-bit registers into one buffer, reversing them for little word order."""
+    if little_word_order:
+        registers = registers[::-1]
+    packer = _REGISTER_PACKERS.get(len(registers)) or struct.Struct(f">{len(registers)}H")
+    return packer.pack(*registers)
+
+
+@dataclass(slots=True, eq=False)
+class _EntityReader:
+    """What a poll needs per entity, resolved once per options list (hashed by identity)."""
+
+    entity: dict
+    key: str
+    address: int
+    count: int
+    reg_type: str
+    convert: Callable[[list], Any]
+
+
+# Decode a poll in the executor from this many values on; below that the
+# thread hand-off costs more than the decoding itself
+EXECUTOR_DECODE_MIN = 250
+
+
+def _convert_all(raw_values: list[tuple[_EntityReader, list]]) -> dict[str, Any]:
+    """Decode (and format) every value read in a poll."""
+    return {reader.key: reader.convert(values) for reader, values in raw_values}
+
+
 @ProtocolRegistry.register("modbus")
 class ModbusCoordinator(BaseProtocolCoordinator):
     """Modbus protocol coordinator."""
@@ -47,6 +86,28 @@ class ModbusCoordinator(BaseProtocolCoordinator):
         
         self.protocol_name = "modbus"
         self._lock = asyncio.Lock()
+
+        # Per-entity read plan for the current options list
+        self._pipeline_for: list[dict] | None = None
+        self._pipeline: list[_EntityReader] = []
+
+        # (register_type, address, count) -> (monotonic time, values) from recent
+        # reads, so service reads right after a poll skip the bus; cleared on writes,
+        # refilled by each poll and purged of expired entries by other reads
+        self._read_cache: dict[tuple[str, int, int], tuple[float, list]] = {}
+
+        # Merged blocks (register_type, start, count) the device rejected as one
+        # read -> when; their entities are read separately for a while
+        self._split_blocks: dict[tuple[str, int, int], float] = {}
+
+        # (name, address) -> register type detected for "auto" entities this run;
+        # entity objects keep their original config dict until a reload
+        self._detected_types: dict[tuple, str] = {}
+        self._detected_pending = False  # detections not yet saved to the options
+
+        # (register type, address, device id) -> words of the last successful
+        # write, from entities and the write_register service alike
+        self._last_written: dict[tuple[str, int, int], list] = {}
     
     # ----------------------------------------------------------------
     # BaseProtocolCoordinator Implementation
@@ -61,33 +122,83 @@ class ModbusCoordinator(BaseProtocolCoordinator):
         if not entities:
             return {}
 
-        new_data = {}
+        raw_values: list[tuple[_EntityReader, list]] = []
         failed_count = 0
-        consecutive_failures = 0
         max_consecutive_failures = 2
 
         async with self._lock:
-            for entity in entities:
-                # Early abort if device is clearly dead
-                if consecutive_failures >= max_consecutive_failures:
-                    _LOGGER.warning(
-                        "[Modbus] Too many consecutive failures (%d) — aborting update cycle",
-                        max_consecutive_failures
-                    )
-                    await self.client.disconnect()
+            pipeline = self._entity_pipeline(entities)
+            specs = []
+            auto_detect = []
+            for reader in pipeline:
+                if reader.reg_type == "auto":
+                    auto_detect.append(reader)
+                else:
+                    specs.append((reader, reader.reg_type, reader.address, reader.count))
+
+            # One request per block of nearby registers, sliced back per entity
+            results = await self.client.read_many(
+                specs,
+                max_gap=self.my_config_entry.options.get(CONF_MAX_GAP, DEFAULT_MAX_GAP),
+                max_failures=max_consecutive_failures,
+                split_blocks=self._split_blocks,
+            )
+            aborted = len(results) < len(specs)
+            now = time.monotonic()
+            self._read_cache.clear()
+            for reader, reg_type, address, count in specs:
+                values = results.get(reader)
+                if not values:
+                    failed_count += 1
+                    continue
+                self._read_cache[(reg_type, address, count)] = (now, values)
+                raw_values.append((reader, values))
+
+            # Entities still set to auto-detect are probed one by one
+            consecutive_failures = 0
+            for reader in auto_detect:
+                if aborted or consecutive_failures >= max_consecutive_failures:
+                    aborted = True
                     break
 
-                result = await self._read_entity(entity)
+                result = await self._read_entity(reader.entity)
                 if result is None:
                     failed_count += 1
                     consecutive_failures += 1
                     continue
 
                 consecutive_failures = 0  # reset on success
-                key = reg_key(entity["name"])
-                decoded = self._decode_value(result.values, entity)
-                formatted = self._format_value(decoded, entity)
-                new_data[key] = formatted
+                reg_type, values = result
+                self._detected_pending = True
+                self._detected_types[(reader.entity.get("name"), reader.entity.get("address"))] = reg_type
+                reader.reg_type = reg_type
+                raw_values.append((reader, values))
+
+            # Early abort if device is clearly dead
+            if aborted:
+                _LOGGER.warning(
+                    "[Modbus] Too many consecutive failures (%d) — aborting update cycle",
+                    max_consecutive_failures
+                )
+                await self.client.disconnect()
+
+        # A polled value that differs from what we wrote makes the next write go out
+        if self._last_written:
+            slave_id = self.client.slave_id
+            for reader, values in raw_values:
+                written_key = (reader.reg_type, reader.address, slave_id)
+                last = self._last_written.get(written_key)
+                if last is not None and last != values:
+                    del self._last_written[written_key]
+
+        # Decoding is pure CPU work: keep large maps off the event loop
+        if len(raw_values) >= EXECUTOR_DECODE_MIN:
+            new_data = await self.hass.async_add_executor_job(_convert_all, raw_values)
+        else:
+            new_data = _convert_all(raw_values)
+
+        if self._detected_pending:
+            self._store_detected_types(entities)
 
         # Optional final health check
         if failed_count > len(entities) // 2:
@@ -95,8 +206,80 @@ class ModbusCoordinator(BaseProtocolCoordinator):
 
         return new_data
 
-    async def _read_entity(self, entity: dict) -> Any | None:
-        """Read one entity — handles auto-detect and direct read."""
+    def _entity_pipeline(self, entities: list[dict]) -> list[_EntityReader]:
+        """
+        Return the read plan per entity, built once per options list.
+
+        The options list is replaced (not mutated) when entities change, so
+        identity is enough to know the pipeline is still valid.
+        """
+        if entities is not self._pipeline_for:
+            self._pipeline = [
+                _EntityReader(
+                    entity=entity,
+                    key=sys.intern(reg_key(entity["name"])),
+                    address=int(entity["address"]),
+                    count=TYPE_SIZES.get(entity["data_type"].lower(), 1),
+                    # Interned on the reader; the option dicts are not ours to change
+                    reg_type=sys.intern(self._register_type(entity)),
+                    convert=self._make_converter(entity),
+                )
+                for entity in entities
+            ]
+            self._pipeline_for = entities
+        return self._pipeline
+
+    def _make_converter(self, entity: dict) -> Callable[[list], Any]:
+        """Bind decode (and format, only if the entity has one) for raw values."""
+        decode = self._make_decoder(entity)
+        if not str(entity.get("format") or "").strip():
+            return decode
+        format_value = self._format_value
+        return lambda values: format_value(decode(values), entity)
+
+    def _store_detected_types(self, entities: list[dict]) -> None:
+        """
+        Save auto-detected register types in the options, once per poll.
+
+        Only the detected entities are copied. register_type stays "auto" (it is
+        part of the entity unique_id); the result goes to CONF_DETECTED_TYPE.
+        If the options changed while the poll ran, nothing is written and the
+        next poll retries against the new list.
+        """
+        if self.my_config_entry.options.get(CONF_ENTITIES) is not entities:
+            return
+
+        updated = None
+        for index, entity in enumerate(entities):
+            if entity.get("register_type") != "auto":
+                continue
+            detected = self._detected_types.get((entity.get("name"), entity.get("address")))
+            if detected is None or entity.get(CONF_DETECTED_TYPE) == detected:
+                continue
+            if updated is None:
+                updated = list(entities)
+            updated[index] = {**entity, CONF_DETECTED_TYPE: detected}
+
+        self._detected_pending = False
+        if updated is not None:
+            self.hass.config_entries.async_update_entry(
+                self.my_config_entry,
+                options={**self.my_config_entry.options, CONF_ENTITIES: updated},
+            )
+
+    def _register_type(self, entity_config: dict) -> str:
+        """Configured register type, or the detected one for "auto" entities."""
+        reg_type = entity_config.get("register_type", "holding")
+        if reg_type != "auto":
+            return reg_type
+        return (
+            self._detected_types.get((entity_config.get("name"), entity_config.get("address")))
+            or entity_config.get(CONF_DETECTED_TYPE)
+            or reg_type
+        )
+
+    async def _read_entity(self, entity: dict) -> tuple[str, list] | None:
+        """Read one entity — handles auto-detect and direct read; returns (register type, values)."""
         address = int(entity["address"])
         count = int(TYPE_SIZES.get(entity["data_type"].lower(), 1))
         reg_type = entity.get("register_type", "holding")
@@ -107,35 +290,46 @@ class ModbusCoordinator(BaseProtocolCoordinator):
             if detected is None:
                 return None
             reg_type, result = detected
-            entity["register_type"] = reg_type
         else:
             result = await self._direct_read(reg_type, address, count)
 
         if result is None or result.isError():
             return None
 
-        # Extract values
-        if reg_type in ("coil", "discrete"):
-            values = result.bits[:count]
-        else:
-            values = result.registers[:count]
+        # Extract values; bits are padded to whole bytes, registers usually exact
+        values = result.bits if reg_type in ("coil", "discrete") else result.registers
+        if len(values) != count:
+            values = values[:count]
 
         if not values:
             _LOGGER.warning("Empty response for '%s'", entity["name"])
             return None
 
-        return type("ReadResult", (), {"values": values})()
+        self._cache_values((reg_type, address, count), values)
+        return reg_type, values
+
+    def _cached_values(self, reg_type: str, address: int, count: int) -> list | None:
+        """Return values read within half a poll interval, else None."""
+        hit = self._read_cache.get((reg_type, address, count))
+        if hit is None:
+            return None
+        read_at, values = hit
+        if time.monotonic() - read_at < self.update_interval.total_seconds() * 0.5:
+            return values
+        return None
+
+    def _cache_values(self, key: tuple[str, int, int], values: list) -> None:
+        """Store values for _cached_values, dropping entries that have expired."""
+        now = time.monotonic()
+        max_age = self.update_interval.total_seconds() * 0.5
+        cache = self._read_cache
+        for expired in [k for k, (read_at, _) in cache.items() if now - read_at >= max_age]:
+            del cache[expired]
+        cache[key] = (now, values)
 
     async def _auto_detect_type(self, address: int, count: int) -> tuple[str, Any] | None:
         """Try different register types until one succeeds."""
-        methods = [
-            ("holding", self.client.raw_client.read_holding_registers),
-            ("input", self.client.raw_client.read_input_registers),
-            ("coil", self.client.raw_client.read_coils),
-            ("discrete", self.client.raw_client.read_discrete_inputs),        
-        ]
-
-        for name, method in methods:
+        for name, method in self.client.readers.items():
             try:
                 result = await method(address=address, count=count, device_id=self.client.slave_id)
                 if not result.isError():
@@ -148,14 +342,7 @@ class ModbusCoordinator(BaseProtocolCoordinator):
 
     async def _direct_read(self, reg_type: str, address: int, count: int) -> Any | None:
         """Perform direct read for known register type."""
-        method_map = {
-            "holding": self.client.raw_client.read_holding_registers,
-            "input": self.client.raw_client.read_input_registers,
-            "coil": self.client.raw_client.read_coils,
-            "discrete": self.client.raw_client.read_discrete_inputs,
-        }
-
-        method = method_map.get(reg_type)
+        method = self.client.readers.get(reg_type)
         if method is None:
             _LOGGER.error("Unknown register_type '%s'", reg_type)
             return None
@@ -168,66 +355,66 @@ class ModbusCoordinator(BaseProtocolCoordinator):
     
    
     def _decode_value(self, raw_value: Any, entity_config: dict) -> Any | None:
-        values = raw_value
-        if not values:
-            return None
-
-        try:
-            data_type = entity_config.get("data_type", "uint16").lower()
-            word_order = entity_config.get("word_order", "big")
+        return self._make_decoder(entity_config)(raw_value)
+
+    def _make_decoder(self, entity_config: dict) -> Callable[[list], Any | None]:
+        """Resolve an entity's decode settings once; returns raw values -> value."""
+        data_type = str(entity_config.get("data_type") or "uint16").lower()
+        little_word_order = str(entity_config.get("word_order") or "big").lower() == "little"
+        expected = TYPE_SIZES.get(data_type, 1)
+        # Unknown types decode as uint16 (only one register is read)
+        unpacker = None if data_type == "string" else _STRUCTS.get(data_type, _STRUCTS["uint16"])
+        is_float32 = data_type == "float32"
+        scale = entity_config.get("scale", 1.0)
+        offset = entity_config.get("offset", 0.0)
+
+        def decode(values: list) -> Any | None:
+            if not values:
+                return None
 
-            if isinstance(values[0], bool):
-                if len(values) == 1:
-                    return bool(values[0])
-                return int("".join("1" if b else "0" for b in values[::-1]), 2)
+            try:
+                if isinstance(values[0], bool):
+                    if len(values) == 1:
+                        return bool(values[0])
+                    # First bit is the least significant
+                    packed = 0
+                    for i, bit in enumerate(values):
+                        if bit:
+                            packed |= 1 << i
+                    return packed
+
+                if len(values) < expected:
+                    return None
+                if len(values) > expected:
+                    values = values[:expected]
 
-            expected = TYPE_SIZES.get(data_type, 1)
-            if len(values) < expected:
-                return None
-            values = values[:expected]
-
-            dt_map = {
-                "uint16": ModbusClientMixin.DATATYPE.UINT16,
-                "int16": ModbusClientMixin.DATATYPE.INT16,
-                "uint32": ModbusClientMixin.DATATYPE.UINT32,
-                "int32": ModbusClientMixin.DATATYPE.INT32,
-                "float32": ModbusClientMixin.DATATYPE.FLOAT32,
-                "uint64": ModbusClientMixin.DATATYPE.UINT64,
-                "int64": ModbusClientMixin.DATATYPE.INT64,
-                "string": ModbusClientMixin.DATATYPE.STRING,
-            }
-            target_type = dt_map.get(data_type, ModbusClientMixin.DATATYPE.UINT16)
-
-            decoded = self.client.raw_client.convert_from_registers(
-                registers=values,
-                data_type=target_type,
-                word_order=0 if word_order.lower() == "big" else 1,
-            )
+                buffer = _registers_to_bytes(values, little_word_order)
+                if unpacker is None:
+                    decoded = buffer.rstrip(b"\x00").decode("utf-8")
+                else:
+                    decoded = unpacker.unpack(buffer)[0]
+                    if is_float32:
+                        decoded = round(decoded, 6)
 
-            if data_type == "float32" and isinstance(decoded, float):
-                decoded = round(decoded, 6)
-            if data_type == "string" and isinstance(decoded, str):
-                decoded = decoded.rstrip("\x00")
+                if isinstance(decoded, (int, float)):
+                    decoded = decoded * scale + offset
 
-            if isinstance(decoded, (int, float)):
-                scale = entity_config.get("scale", 1.0)
-                offset = entity_config.get("offset", 0.0)
-                decoded = decoded * scale + offset
+                return decoded
 
-            return decoded
+            except Exception as err:
+                _LOGGER.error(
+                    "Error decoding register '%s' at address %s: %s",
+                    entity_config.get("name"), entity_config.get("address"), err
+                )
+                return None
 
-        except Exception as err:
-            _LOGGER.error(
-                "Error decoding register '%s' at address %s: %s",
-                entity_config.get("name"), entity_config.get("address"), err
-            )
-            return None
+        return decode
     
     def _encode_value(self, value: Any, entity_config: dict) -> list[int] | bool | None:
         """Encode value for write – full string support for Wizard card/service."""
         try:
             data_type = entity_config.get("data_type", "uint16").lower()
-            register_type = entity_config.get("register_type", "holding").lower()
+            register_type = self._register_type(entity_config).lower()
             word_order = entity_config.get("word_order", "big").lower()
         
             # _LOGGER.debug("Encoding started: value=%r (type=%s), data_type=%s, register_type=%s", value, type(value).__name__, data_type, register_type)
@@ -283,30 +470,23 @@ class ModbusCoordinator(BaseProtocolCoordinator):
         except Exception as err:
             _LOGGER.error("Encoding error %s (%s): %s", value, data_type, err)
             return None    
-        # Multi-register types
-        dt_map = {
-            "uint32": ModbusClientMixin.DATATYPE.UINT32,
-            "int32": ModbusClientMixin.DATATYPE.INT32,
-            "float32": ModbusClientMixin.DATATYPE.FLOAT32,
-            "uint64": ModbusClientMixin.DATATYPE.UINT64,
-            "int64": ModbusClientMixin.DATATYPE.INT64,
-        }
-        target_type = dt_map.get(data_type, ModbusClientMixin.DATATYPE.UINT16)
+        # Multi-register types (unknown types are written as one uint16)
+        packer = _STRUCTS.get(data_type, _STRUCTS["uint16"])
     
-        if target_type == ModbusClientMixin.DATATYPE.FLOAT32:
+        if data_type == "float32":
             value = float(value)
         else:
             value = int(round(float(value)))
     
         try:
-            return self.client.raw_client.convert_to_registers(
-                value=value,
-                data_type=target_type,
-                word_order=0 if word_order == "big" else 1,
-            )
+            buffer = packer.pack(value)
+            registers = list(_REGISTER_PACKERS[len(buffer) // 2].unpack(buffer))
         except Exception as err:
-            _LOGGER.error("pymodbus convert_to_registers failed for %s (%s): %s", original_value, data_type, err)
+            _LOGGER.error("Encoding to registers failed for %s (%s): %s", original_value, data_type, err)
             return None
+        if word_order == "little":
+            registers.reverse()
+        return registers
     # ----------------------------------------------------------------------------
     # the service read method (naming a bit close to later refactoring above...
     #------------------------------------------------------------------------------
@@ -316,22 +496,28 @@ class ModbusCoordinator(BaseProtocolCoordinator):
             return None
     
         addr = int(address)
-        size = kwargs.get("size") or TYPE_SIZES.get(entity_config.get("data_type", "uint16").lower(), 1)
-        reg_type = kwargs.get("register_type") or entity_config.get("register_type", "holding")
+        size = int(kwargs.get("size") or TYPE_SIZES.get(entity_config.get("data_type", "uint16").lower(), 1))
+        reg_type = kwargs.get("register_type") or self._register_type(entity_config)
         raw = kwargs.get("raw", False)
     
         async with self._lock:
             values = None
             detected_type = reg_type
     
-            # If explicitly not auto, just read once
+            # If explicitly not auto, just read once; raw (debug) reads always
+            # go to the device
             if reg_type != "auto":
-                values = await self.client.read(address=address, count=size, register_type=reg_type)
+                if not raw:
+                    values = self._cached_values(reg_type, addr, size)
+                if values is None:
+                    values = await self.client.read(address=addr, count=size, register_type=reg_type)
+                    if values is not None:
+                        self._cache_values((reg_type, addr, size), values)
     
             else:
                 # Proper auto-detect: try in sensible order (same as bulk)
-                for test_type in ["holding", "input", "coil", "discrete"]:
-                    test_values = await self.client.read(address=address, count=size, register_type=test_type)
+                for test_type in self.client.readers:
+                    test_values = await self.client.read(address=addr, count=size, register_type=test_type)
                     if test_values is not None:
                         values = test_values
                         detected_type = test_type
@@ -356,6 +542,14 @@ class ModbusCoordinator(BaseProtocolCoordinator):
             return self._decode_value(values, entity_config)
     
     async def async_write_entity(self, address: str, value: Any, entity_config: dict, **kwargs) -> bool:
+        """
+        Encode and write a value; returns True on success.
+
+        A write of the same words to the same registers as the last successful
+        write is skipped (and reported as success) until a poll reads back
+        something else. A change made on the device after the last poll is
+        therefore not noticed: pass force=True to always write.
+        """
         if not await self._async_connect():
             _LOGGER.error("Write failed – could not connect to device")
             return False
@@ -364,16 +558,34 @@ class ModbusCoordinator(BaseProtocolCoordinator):
         if encoded_value is None:
             _LOGGER.error("Write failed – encoding returned None for value %r", value)
             return False
-    
+
+        reg_type = self._register_type(entity_config)
+        written_key = (reg_type, int(address), self.client.slave_id)
+        written = encoded_value if isinstance(encoded_value, list) else [encoded_value]
+        if not kwargs.get("force") and self._last_written.get(written_key) == written:
+            return True
+
+        # Written registers may overlap cached reads
+        self._read_cache.clear()
     
         # _LOGGER.debug("Calling client.write: address=%s, encoded=%r, register_type=%s", address, encoded_value, entity_config.get("register_type", "holding"))
     
         success = await self.client.write(
             address=address,
             value=encoded_value,
-            register_type=entity_config.get("register_type", "holding"),
+            register_type=reg_type,
         )
     
+        if success:
+            # Remembered writes overlapping these registers no longer hold
+            start, end = written_key[1], written_key[1] + len(written)
+            for key, words in list(self._last_written.items()):
+                if key[0] == reg_type and key[2] == written_key[2] and key[1] < end and start < key[1] + len(words):
+                    del self._last_written[key]
+            self._last_written[written_key] = written
+        else:
+            self._last_written.pop(written_key, None)
+    
         if not success:
             _LOGGER.error("client.write returned False – check device logs or connection")
         